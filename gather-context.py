@@ -5,11 +5,16 @@ It walks through the current directory, collects code files, and copies their co
 """
 
 import os
+import re
 import fnmatch
 import argparse
-import pyperclip
+import functools
+import collections
+import shutil
+import subprocess
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Default file extensions to include
 DEFAULT_EXTENSIONS = [
@@ -29,25 +34,399 @@ DEFAULT_EXCLUDES = [
     '**/yarn.lock', '**/Pipfile.lock', '**/poetry.lock'
 ]
 
-def is_excluded(path, exclude_patterns):
-    """Check if a path matches any of the exclusion patterns."""
-    path_str = str(path)
-    for pattern in exclude_patterns:
-        if fnmatch.fnmatch(path_str, pattern):
+# Threads used to read files, and how many reads may be queued ahead of use
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+READ_AHEAD = READ_WORKERS * 4
+
+# Leading bytes checked for NUL to detect binary files before reading them fully
+BINARY_SNIFF_BYTES = 512
+
+# Globs that only check a file extension, e.g. '*.py'
+_EXTENSION_GLOB = re.compile(r'^(?:\*\*/)?\*\.([A-Za-z0-9_+]+)$')
+# Globs that only check a file name ending, e.g. '**/*.min.js'
+_SUFFIX_GLOB = re.compile(r'^(?:\*\*/)?\*(\.[^/*?\[]+)$')
+# Globs that only check an exact file name, e.g. '**/yarn.lock'
+_NAME_GLOB = re.compile(r'^\*\*/([^/*?\[]+)$')
+# Globs that exclude everything below a directory name, e.g. '**/node_modules/**'
+_DIR_GLOB = re.compile(r'^\*\*/([^/*?\[]+)/\*\*$')
+
+@functools.lru_cache(maxsize=512)
+def _translate(pattern):
+    """Translate a glob pattern into regex source."""
+    # Normalize case like fnmatch.fnmatch() does, so Windows matching is unchanged
+    return fnmatch.translate(os.path.normcase(pattern))
+
+class _HyperscanPatterns:
+    """A union of glob patterns compiled into a Hyperscan database, matched like a regex."""
+    
+    def __init__(self, patterns, hyperscan):
+        expressions = []
+        for pattern in patterns:
+            # Hyperscan has no atomic groups, but never backtracks either, and
+            # its \Z also matches before a final newline, unlike Python's
+            expression = _translate(pattern).replace('(?>', '(?:')
+            if expression.endswith('\\Z'):
+                expression = expression[:-2] + '\\z'
+            expressions.append(('^' + expression).encode('utf-8'))
+        
+        # UTF-8 and UCP make '?' and character classes match whole characters,
+        # as they do with re
+        flags = (hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_DOTALL
+                 | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP)
+        self._database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        self._database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            flags=[flags] * len(expressions),
+        )
+        self._patterns = patterns
+        self._scan_terminated = hyperscan.ScanTerminated
+    
+    def match(self, path_str):
+        """Return True if any pattern matches the whole path, otherwise None."""
+        try:
+            data = path_str.encode('utf-8')
+        except UnicodeEncodeError:
+            # Undecodable file names can't be scanned as UTF-8
+            return _compile_regex(self._patterns).match(path_str)
+        try:
+            self._database.scan(data, match_event_handler=_stop_scan)
+        except self._scan_terminated:
             return True
-    return False
+        return None
+
+def _stop_scan(*args):
+    """Hyperscan match handler that stops the scan at the first match."""
+    return True
+
+@functools.lru_cache(maxsize=None)
+def _load_hyperscan():
+    """
+    Import the optional hyperscan module if enabled with GATHER_CONTEXT_HYPERSCAN=1.
+    
+    Returns None when it isn't enabled or isn't installed. It is opt-in since
+    some Hyperscan builds miss matches that re finds.
+    """
+    if os.environ.get('GATHER_CONTEXT_HYPERSCAN') != '1':
+        return None
+    # Imported here since only complex patterns need it and the import is slow
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+    return hyperscan
+
+def _sample_paths(patterns):
+    """Yield paths of varied lengths shaped like the given glob patterns."""
+    for pattern in patterns:
+        core = re.sub(r'\[[^\]]*\]', 'x', os.path.normcase(pattern))
+        for variant in (core.replace('**', 'sub').replace('*', 'x').replace('?', 'y'),
+                        core.replace('*', '').replace('?', 'y')):
+            variant = variant.lstrip(os.sep)
+            for length in range(48):
+                yield os.sep + 'p' * length + os.sep + variant
+                yield os.sep + 'p' * length + os.sep + variant + 'z'
+
+@functools.lru_cache(maxsize=None)
+def _compile_regex(patterns):
+    """Compile a tuple of glob patterns into a single regex matching any of them."""
+    return re.compile('|'.join(f'(?:{_translate(p)})' for p in patterns))
+
+@functools.lru_cache(maxsize=None)
+def _compile_patterns(patterns):
+    """
+    Compile a tuple of glob patterns into a single matcher for any of them.
+    
+    Uses Hyperscan when it is enabled, accepts the patterns and agrees with
+    the union regex on sample paths, otherwise the union regex. Either way
+    the result has a re-style match() method.
+    """
+    if not patterns:
+        return re.compile(r'(?!)')
+    regex = _compile_regex(patterns)
+    hyperscan = _load_hyperscan()
+    if hyperscan is not None:
+        try:
+            matcher = _HyperscanPatterns(patterns, hyperscan)
+        except (hyperscan.error, UnicodeEncodeError):
+            return regex
+        if all((matcher.match(path) is None) == (regex.match(path) is None)
+               for path in _sample_paths(patterns)):
+            return matcher
+    return regex
+
+def is_excluded(path_str, exclude_re):
+    """Check if a path string matches exclusion patterns compiled by _compile_patterns."""
+    return exclude_re.match(os.path.normcase(path_str)) is not None
+
+def is_included(path_str, include_re):
+    """Check if a path string matches inclusion patterns compiled by _compile_patterns."""
+    return include_re.match(os.path.normcase(path_str)) is not None
 
-def is_included(path, include_patterns):
-    """Check if a path matches any of the inclusion patterns."""
-    path_str = str(path)
+def _normalize_part(text):
+    """Normalize a literal taken from a pattern and intern it for fast comparisons."""
+    return sys.intern(os.path.normcase(text))
+
+def _split_includes(include_patterns):
+    """Split include patterns into a set of extensions and a regex for the rest."""
+    extensions = set()
+    others = []
     for pattern in include_patterns:
-        if fnmatch.fnmatch(path_str, pattern):
-            return True
-    return False
+        match = _EXTENSION_GLOB.match(pattern)
+        if match:
+            extensions.add(_normalize_part(match.group(1)))
+        else:
+            others.append(pattern)
+    regex = _compile_patterns(tuple(others)) if others else None
+    return frozenset(extensions), regex
+
+def _split_excludes(exclude_patterns):
+    """
+    Split exclude patterns into file names, name suffixes, directory names
+    and a regex for the rest, so most paths are checked with str operations.
+    """
+    names = set()
+    suffixes = set()
+    dirnames = set()
+    others = []
+    for pattern in exclude_patterns:
+        match = _DIR_GLOB.match(pattern)
+        if match:
+            dirnames.add(_normalize_part(match.group(1)))
+            continue
+        match = _NAME_GLOB.match(pattern)
+        if match:
+            names.add(_normalize_part(match.group(1)))
+            continue
+        match = _SUFFIX_GLOB.match(pattern)
+        if match:
+            suffixes.add(_normalize_part(match.group(1)))
+        else:
+            others.append(pattern)
+    regex = _compile_patterns(tuple(others)) if others else None
+    return frozenset(names), tuple(suffixes), frozenset(dirnames), regex
+
+def _set_literal(values):
+    """Format a set of strings as Python source for a set display."""
+    return '{' + ', '.join(repr(value) for value in sorted(values)) + '}'
+
+def _generate_matcher(exclude_names, exclude_suffixes, exclude_regex,
+                      extensions=None, include_regex=None):
+    """
+    Generate a function deciding whether to keep a normalized name and its path.
+    
+    The pattern literals are inlined as constants in straight-line code, so
+    nothing loops over the patterns per path. Exclude checks run first and
+    reject; then, for files, include checks accept. Without extensions the
+    function keeps anything not excluded, as used for directories.
+    """
+    lines = ['def match(name, path):']
+    if exclude_names:
+        lines.append(f'    if name in {_set_literal(exclude_names)}:')
+        lines.append('        return False')
+    if exclude_suffixes:
+        lines.append(f'    if name.endswith({tuple(sorted(exclude_suffixes))!r}):')
+        lines.append('        return False')
+    if exclude_regex is not None:
+        lines.append('    if _is_excluded(path, _exclude_regex):')
+        lines.append('        return False')
+    
+    if extensions is None:
+        lines.append('    return True')
+    else:
+        if extensions:
+            lines.append("    _, dot, extension = name.rpartition('.')")
+            lines.append(f'    if dot and extension in {_set_literal(extensions)}:')
+            lines.append('        return True')
+        if include_regex is not None:
+            lines.append('    return _is_included(path, _include_regex)')
+        else:
+            lines.append('    return False')
+    
+    namespace = {
+        '_is_excluded': is_excluded,
+        '_is_included': is_included,
+        '_exclude_regex': exclude_regex,
+        '_include_regex': include_regex,
+    }
+    exec('\n'.join(lines), namespace)
+    return namespace['match']
+
+@functools.lru_cache(maxsize=None)
+def _build_filters(include_patterns, exclude_patterns):
+    """
+    Build the walk filters for tuples of include and exclude patterns.
+    
+    Returns (wanted_file, wanted_dir, excluded_dirnames), where the first two
+    are matchers from _generate_matcher. Results are cached per pattern pair.
+    """
+    extensions, include_regex = _split_includes(include_patterns)
+    names, suffixes, dirnames, exclude_regex = _split_excludes(exclude_patterns)
+    wanted_file = _generate_matcher(names, suffixes, exclude_regex,
+                                    extensions, include_regex)
+    wanted_dir = _generate_matcher(names | dirnames, suffixes, exclude_regex)
+    return wanted_file, wanted_dir, dirnames
+
+# Filters for the default patterns, built once at import
+_DEFAULT_FILTERS = _build_filters(tuple(DEFAULT_EXTENSIONS), tuple(DEFAULT_EXCLUDES))
+
+def _walk(top, filters, stats):
+    """
+    Yield the paths of files under top that pass the filters from _build_filters.
+    
+    Visits directories in the same order as os.walk and does not follow
+    symlinked directories. Uses os.scandir so entry types come from the
+    directory listing instead of extra stat calls. Rejected files are
+    counted locally and added to stats['excluded_files'] once the walk ends.
+    """
+    wanted_file, wanted_dir, excluded_dirnames = filters
+    # Subdirectories are pruned by name below, so a path can only fall inside
+    # an excluded directory name when top itself does
+    below_excluded_dir = not excluded_dirnames.isdisjoint(
+        os.path.normcase(top).split(os.sep))
+    
+    excluded = 0
+    try:
+        stack = [top]
+        while stack:
+            root = stack.pop()
+            try:
+                with os.scandir(root) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                name = os.path.normcase(entry.name)
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                
+                if is_dir:
+                    # Skip symlinked and excluded directories
+                    if (below_excluded_dir or entry.is_symlink()
+                            or not wanted_dir(name, entry.path)):
+                        continue
+                    subdirs.append(entry.path)
+                    continue
+                
+                # Skip if excluded or not included
+                path_str = entry.path
+                if below_excluded_dir or not wanted_file(name, path_str):
+                    excluded += 1
+                    continue
+                yield path_str
+            
+            stack.extend(reversed(subdirs))
+    finally:
+        stats['excluded_files'] += excluded
+
+def _read_file(path):
+    """
+    Read a file as bytes with newlines translated like text mode would.
+    
+    Uses sized os.read() calls instead of a buffered text-mode open, so the
+    content is only decoded once and its size is known without re-encoding.
+    Returns None without reading the rest of the file if a NUL byte appears
+    in its first BINARY_SNIFF_BYTES, the usual sign of a binary file.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        raw = os.read(fd, min(size, BINARY_SNIFF_BYTES)) if size else b''
+        if b'\0' in raw:
+            return None
+        while len(raw) < size:
+            chunk = os.read(fd, size - len(raw))
+            if not chunk:
+                break
+            raw += chunk
+    finally:
+        os.close(fd)
+    
+    if b'\r' in raw:
+        raw = raw.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return raw
+
+def _read_file_or_none(path):
+    """Read a file with _read_file, returning None if it can't be read or is binary."""
+    try:
+        return _read_file(path)
+    except OSError:
+        return None
+
+def _read_files(paths):
+    """
+    Read each of the given files, yielding (path, raw_bytes) in input order.
+    
+    raw_bytes is None for files that couldn't be read or look binary. Reads
+    run on a thread pool so several are in flight at once, with at most
+    READ_AHEAD queued ahead of the caller; reads still pending when the
+    caller stops are cancelled.
+    
+    Threads are used rather than io_uring: the stdlib has no io_uring
+    interface, and liburing's SQE prep helpers are static inline functions
+    in its headers, so they can't be called through ctypes.
+    """
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        pending = collections.deque()
+        try:
+            for path in paths:
+                pending.append((path, executor.submit(_read_file_or_none, path)))
+                if len(pending) >= READ_AHEAD:
+                    path, future = pending.popleft()
+                    yield path, future.result()
+            while pending:
+                path, future = pending.popleft()
+                yield path, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+def format_file_header(path):
+    """Format the header showing the relative path that precedes a file's content."""
+    return b"\n\n--- " + os.fsencode(str(path)) + b" ---\n\n"
 
-def format_file_content(path, content):
-    """Format the file content with a header showing the relative path."""
-    return f"\n\n--- {path} ---\n\n{content}"
+def _clipboard_command():
+    """Find a native clipboard command that reads from stdin, or return None."""
+    if sys.platform == 'darwin':
+        candidates = [['pbcopy']]
+    elif sys.platform.startswith('linux'):
+        candidates = []
+        if os.environ.get('WAYLAND_DISPLAY'):
+            candidates.append(['wl-copy'])
+        if os.environ.get('DISPLAY'):
+            candidates.append(['xclip', '-selection', 'clipboard'])
+            candidates.append(['xsel', '--clipboard', '--input'])
+    else:
+        candidates = []
+    
+    for command in candidates:
+        if shutil.which(command[0]):
+            return command
+    return None
+
+def copy_to_clipboard(content):
+    """
+    Copy UTF-8 encoded content to the clipboard.
+    
+    The bytes are piped straight into a native clipboard command when one is
+    available, so large contexts aren't decoded and copied again in memory.
+    Otherwise this falls back to pyperclip.
+    """
+    command = _clipboard_command()
+    if command is None:
+        # Imported here since pyperclip probes for backends at import time
+        import pyperclip
+        pyperclip.copy(content.decode('utf-8', 'replace'))
+        return
+    
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, close_fds=True)
+    process.communicate(content)
+    if process.returncode != 0:
+        raise RuntimeError(f"{command[0]} exited with status {process.returncode}")
 
 def gather_context(directory=None, extensions=None, excludes=None, max_size=None, 
                   max_files=None, relative_to=None):
@@ -63,12 +442,19 @@ def gather_context(directory=None, extensions=None, excludes=None, max_size=None
         relative_to: Path to make file paths relative to
     
     Returns:
-        A tuple of (collected_content, stats_dict)
+        A tuple of (collected_content, stats_dict), with the content as a
+        UTF-8 encoded bytearray
     """
+    # Classify and compile the patterns once instead of per path
+    if not extensions and not excludes:
+        filters = _DEFAULT_FILTERS
+    else:
+        filters = _build_filters(
+            tuple(sys.intern(p) for p in extensions or DEFAULT_EXTENSIONS),
+            tuple(sys.intern(p) for p in excludes or DEFAULT_EXCLUDES))
+    
     # Set defaults
     directory = directory or os.getcwd()
-    extensions = extensions or DEFAULT_EXTENSIONS
-    excludes = excludes or DEFAULT_EXCLUDES
     max_size = max_size or float('inf')
     max_files = max_files or float('inf')
     relative_to = relative_to or directory
@@ -77,6 +463,9 @@ def gather_context(directory=None, extensions=None, excludes=None, max_size=None
     directory_path = Path(directory).resolve()
     relative_to_path = Path(relative_to).resolve()
     
+    # Prefix stripped from collected paths, with a trailing separator
+    relative_to_prefix = os.path.normcase(os.path.join(str(relative_to_path), ''))
+    
     # Convert max_size to bytes
     max_size_bytes = max_size * 1024
     
@@ -88,76 +477,86 @@ def gather_context(directory=None, extensions=None, excludes=None, max_size=None
         'empty_files': 0,
         'total_size_bytes': 0,
         'skipped_size_limit': 0,
-        'skipped_file_limit': 0
+        # No longer counted, since the walk stops at the limit; see limit_reached
+        'skipped_file_limit': 0,
+        'limit_reached': False
     }
     
-    # Walk through the directory tree
-    for root, dirs, files in os.walk(directory_path):
-        # Skip excluded directories
-        dirs[:] = [d for d in dirs if not is_excluded(Path(root) / d, excludes)]
+    # Count in locals inside the loop and store them in stats afterwards
+    total_files = included_files = excluded_files = empty_files = 0
+    total_size_bytes = skipped_size_limit = 0
+    
+    # Walk through the directory tree, reading candidate files as they are found
+    paths = _walk(str(directory_path), filters, stats)
+    reader = _read_files(paths)
+    for path_str, raw in reader:
+        total_files += 1
         
-        for file in files:
-            file_path = Path(root) / file
-            
-            # Skip if excluded or not included
-            if is_excluded(file_path, excludes) or not is_included(file_path, extensions):
-                stats['excluded_files'] += 1
-                continue
-            
-            stats['total_files'] += 1
-            
-            # Check if we've reached file limit
-            if stats['included_files'] >= max_files:
-                stats['skipped_file_limit'] += 1
-                continue
-            
-            # Read the file content
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Skip empty files
-                if not content.strip():
-                    stats['empty_files'] += 1
-                    continue
-                
-                file_size = len(content.encode('utf-8'))
-                
-                # Check if we have enough space for this file
-                if stats['total_size_bytes'] + file_size > max_size_bytes:
-                    stats['skipped_size_limit'] += 1
-                    continue
-                
-                # Calculate relative path
-                try:
-                    rel_path = file_path.relative_to(relative_to_path)
-                except ValueError:
-                    rel_path = file_path
-                
-                # Add the file to collected files
-                collected.append((rel_path, content))
-                stats['included_files'] += 1
-                stats['total_size_bytes'] += file_size
-                
-            except (UnicodeDecodeError, IOError) as e:
-                # Skip files that can't be read as text
-                stats['excluded_files'] += 1
-                continue
+        # Skip files that couldn't be read or look binary
+        if raw is None:
+            excluded_files += 1
+            continue
+        
+        # Skip files that can't be read as text
+        try:
+            text = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            excluded_files += 1
+            continue
+        
+        # Skip empty files, including ones with only Unicode whitespace
+        if not text.strip():
+            empty_files += 1
+            continue
+        file_size = len(raw)
+        
+        # Check if we have enough space for this file
+        if total_size_bytes + file_size > max_size_bytes:
+            skipped_size_limit += 1
+            continue
+        
+        # Calculate relative path, keeping the full path outside relative_to
+        if os.path.normcase(path_str).startswith(relative_to_prefix):
+            rel_path = path_str[len(relative_to_prefix):]
+        else:
+            rel_path = path_str
+        
+        # Add the file to collected files
+        collected.append((rel_path, raw))
+        included_files += 1
+        total_size_bytes += file_size
+        
+        # Stop walking once no further file could be collected, noting it only
+        # if another candidate file was actually left behind
+        if included_files >= max_files or total_size_bytes >= max_size_bytes:
+            stats['limit_reached'] = next(reader, None) is not None
+            break
+    
+    # Cancel pending reads and let the walk record its counts
+    reader.close()
+    paths.close()
+    
+    stats['total_files'] = total_files
+    stats['included_files'] = included_files
+    stats['excluded_files'] += excluded_files
+    stats['empty_files'] = empty_files
+    stats['total_size_bytes'] = total_size_bytes
+    stats['skipped_size_limit'] = skipped_size_limit
     
     # Format collected content
     if collected:
-        formatted_content = ""
-        for rel_path, content in collected:
-            formatted_content += format_file_content(rel_path, content)
-        
         # Add header with summary
         header = (
             f"Code context gathered from {directory_path}\n"
             f"Total files: {stats['included_files']}"
         )
-        formatted_content = header + formatted_content
+        formatted_content = bytearray(header.encode('utf-8'))
+        for rel_path, content in collected:
+            formatted_content += format_file_header(rel_path)
+            formatted_content += content
     else:
-        formatted_content = f"No code files found in {directory_path}"
+        formatted_content = bytearray(
+            f"No code files found in {directory_path}".encode('utf-8'))
     
     return formatted_content, stats
 
@@ -220,17 +619,17 @@ def main():
     
     # Output results
     if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
+        with open(args.output, 'wb') as f:
             f.write(content)
         print(f"Context written to {args.output}")
     else:
         try:
-            pyperclip.copy(content)
+            copy_to_clipboard(content)
             print("Context copied to clipboard!")
         except Exception as e:
             print(f"Error copying to clipboard: {e}", file=sys.stderr)
             print("Printing to stdout instead:")
-            print(content)
+            print(content.decode('utf-8', 'replace'))
     
     # Print statistics if verbose
     if args.verbose:
@@ -243,8 +642,8 @@ def main():
         
         if stats['skipped_size_limit'] > 0:
             print(f"  Files skipped due to size limit: {stats['skipped_size_limit']}")
-        if stats['skipped_file_limit'] > 0:
-            print(f"  Files skipped due to file count limit: {stats['skipped_file_limit']}")
+        if stats['limit_reached']:
+            print("  Stopped early after reaching the file count or size limit")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file